@@ -2,135 +2,476 @@ from __future__ import annotations
 
 import os
 import re
-import shutil
 import tempfile
+import threading
 import tkinter as tk
+import zipfile
+from bisect import bisect_right
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from functools import lru_cache
+from itertools import accumulate
 from tkinter import filedialog, messagebox, ttk
+from typing import TYPE_CHECKING
+
+# docx and PyPDF2 (and lxml behind them) are imported inside the functions that
+# use them so the window comes up without paying for them.
+if TYPE_CHECKING:
+    from docx.document import Document
+    from PyPDF2 import PdfReader
+    from PyPDF2.generic import DictionaryObject, IndirectObject
+
+
+PLACEHOLDER_PATTERN = re.compile(r"\{\{([A-Za-z0-9_]+)\}\}", re.ASCII)
+STARTXREF_PATTERN = re.compile(rb"startxref\s+(\d+)")
+XREF_SUBSECTION_PATTERN = re.compile(rb"\s*(\d+)\s+(\d+)\s*$")
+XREF_ENTRY_PATTERN = re.compile(rb"(\d{10}) (\d{5}) ([nf])")
+OBJECT_HEADER_PATTERN = re.compile(rb"\s*(\d+)\s+(\d+)\s+obj")
+HEADER_FOOTER_CONTENT_TYPES = {
+    "application/vnd.openxmlformats-officedocument.wordprocessingml.header+xml",
+    "application/vnd.openxmlformats-officedocument.wordprocessingml.footer+xml",
+}
+CORE_PROPERTIES_RELATIONSHIP = "http://schemas.openxmlformats.org/package/2006/relationships/metadata/core-properties"
+W_NS = "http://schemas.openxmlformats.org/wordprocessingml/2006/main"
+W_R = f"{{{W_NS}}}r"
+W_T = f"{{{W_NS}}}t"
+W_RPR = f"{{{W_NS}}}rPr"
+W_HYPERLINK = f"{{{W_NS}}}hyperlink"
+RUN_BREAK_TAGS = {f"{{{W_NS}}}{tag}" for tag in ("tab", "ptab", "br", "cr", "noBreakHyphen")}
+XML_SPACE = "{http://www.w3.org/XML/1998/namespace}space"
+
+DOCUMENT_CACHE_SIZE = 8
+METADATA_CACHE_SIZE = 128
+WRITE_BUFFER_SIZE = 1024 * 1024
+WORKER_POLL_MS = 50
+PDF_TAIL_SIZE = 1024
+PDF_INFO_KEYS = {
+    "DC:TITLE": "/Title",
+    "DC:CREATOR": "/Author",
+    "CP:DESCRIPTION": "/Subject",
+    "CP:CATEGORY": "/Category",
+}
+_DOC_CACHE: OrderedDict[tuple[str, int, int], Document] = OrderedDict()
+_META_CACHE: OrderedDict[tuple[str, int, int], dict[str, str]] = OrderedDict()
+_CACHE_LOCK = threading.Lock()
+
+
+def _file_key(path: str) -> tuple[str, int, int]:
+    stat = os.stat(path)
+    return os.path.abspath(path), stat.st_mtime_ns, stat.st_size
+
+
+def _cache_put(cache: OrderedDict, key, value, max_size: int) -> None:
+    cache[key] = value
+    while len(cache) > max_size:
+        cache.popitem(last=False)
+
+
+def load_document(docx_path: str) -> Document:
+    key = _file_key(docx_path)
+    with _CACHE_LOCK:
+        document = _DOC_CACHE.get(key)
+        if document is not None:
+            _DOC_CACHE.move_to_end(key)
+            return document
+    from docx import Document
 
-from docx import Document
-from PyPDF2 import PdfReader, PdfWriter
-
-
-PLACEHOLDER_PATTERN = re.compile(r"\{\{([A-Za-z0-9_]+)\}\}")
-
-
-def extract_placeholders(docx_path: str) -> list[str]:
     document = Document(docx_path)
-    found = set()
-
-    def collect_from_paragraphs(paragraphs):
-        for paragraph in paragraphs:
-            for match in PLACEHOLDER_PATTERN.findall(paragraph.text):
-                found.add(match)
-
-    collect_from_paragraphs(document.paragraphs)
-    for table in document.tables:
-        for row in table.rows:
-            for cell in row.cells:
-                collect_from_paragraphs(cell.paragraphs)
-
-    for section in document.sections:
-        collect_from_paragraphs(section.header.paragraphs)
-        collect_from_paragraphs(section.footer.paragraphs)
-
-    return sorted(found)
-
+    with _CACHE_LOCK:
+        _cache_put(_DOC_CACHE, key, document, DOCUMENT_CACHE_SIZE)
+    return document
+
+
+def take_document(docx_path: str) -> Document:
+    # The caller is going to mutate the document, so it must not stay shared in the cache.
+    key = _file_key(docx_path)
+    with _CACHE_LOCK:
+        document = _DOC_CACHE.pop(key, None)
+    if document is None:
+        from docx import Document
+
+        document = Document(docx_path)
+    return document
+
+
+@lru_cache(maxsize=32)
+def _replacement_pattern(keys: frozenset[str]) -> re.Pattern[str]:
+    return re.compile("|".join(re.escape(f"{{{{{key}}}}}") for key in sorted(keys)), re.ASCII)
+
+
+def _iter_text_parts(document: Document):
+    yield document.part
+    for part in document.part.package.iter_parts():
+        if part.content_type in HEADER_FOOTER_CONTENT_TYPES:
+            yield part
+
+
+def _iter_candidate_paragraphs(document: Document):
+    # Only paragraphs with a "{" in some w:t can hold a placeholder; filtering in
+    # XPath keeps large placeholder-free tables from being walked in Python at all.
+    for part in _iter_text_parts(document):
+        yield from part.element.xpath(".//w:p[.//w:t[contains(., '{')]]")
+
+
+def _paragraph_runs(p) -> list:
+    # The runs placeholders are both detected in and replaced in: direct w:r children
+    # and runs inside w:hyperlink. Runs under w:ins, w:sdt, w:smartTag or w:fldSimple
+    # are left alone on both sides so the form never offers a field that is not filled.
+    runs = []
+    for child in p:
+        if child.tag == W_R:
+            runs.append(child)
+        elif child.tag == W_HYPERLINK:
+            runs.extend(child.iterchildren(W_R))
+    return runs
+
+
+def _paragraph_text_nodes(p) -> list:
+    # The w:t elements of those runs in document order, with None for tabs and breaks
+    # so text on either side of one never joins into a placeholder.
+    nodes = []
+    for r in _paragraph_runs(p):
+        for child in r:
+            if child.tag == W_T:
+                nodes.append(child)
+            elif child.tag in RUN_BREAK_TAGS:
+                nodes.append(None)
+    return nodes
+
+
+def _node_texts(nodes: list) -> list[str]:
+    return ["\n" if node is None else node.text or "" for node in nodes]
+
+
+def _remove_emptied(nodes: list) -> None:
+    # A run left with nothing but its rPr and empty w:t goes entirely; otherwise only
+    # the empty w:t does. One slice assignment per parent instead of a remove() each.
+    doomed = set()
+    for node in nodes:
+        r = node.getparent()
+        if all(child.tag == W_RPR or (child.tag == W_T and not child.text) for child in r):
+            doomed.add(r)
+        else:
+            doomed.add(node)
+    for parent in {element.getparent() for element in doomed}:
+        parent[:] = [child for child in parent if child not in doomed]
 
-def replace_placeholders(docx_path: str, replacements: dict[str, str], output_path: str) -> None:
-    document = Document(docx_path)
 
-    def replace_in_paragraphs(paragraphs):
-        for paragraph in paragraphs:
-            original_text = paragraph.text
-            new_text = original_text
-            for key, value in replacements.items():
-                placeholder = f"{{{{{key}}}}}"
-                new_text = new_text.replace(placeholder, value)
-            if new_text != original_text:
-                for run in list(paragraph.runs):
-                    paragraph._p.remove(run._element)
-                paragraph.add_run(new_text)
-
-    replace_in_paragraphs(document.paragraphs)
-
-    for table in document.tables:
-        for row in table.rows:
-            for cell in row.cells:
-                replace_in_paragraphs(cell.paragraphs)
-
-    for section in document.sections:
-        replace_in_paragraphs(section.header.paragraphs)
-        replace_in_paragraphs(section.footer.paragraphs)
+def extract_placeholders(docx_path: str) -> list[str]:
+    document = load_document(docx_path)
+    # Same paragraph walk and run set as replace_placeholders, so every field offered
+    # in the form is one the replacement can actually fill.
+    text = "\n".join("".join(_node_texts(_paragraph_text_nodes(p))) for p in _iter_candidate_paragraphs(document))
+    return sorted(set(PLACEHOLDER_PATTERN.findall(text)))
+
+
+def template_pattern(placeholders: list[str]) -> re.Pattern[str] | None:
+    return _replacement_pattern(frozenset(placeholders)) if placeholders else None
+
+
+def replace_placeholders(
+    document: Document,
+    replacements: dict[str, str],
+    output_path: str,
+    pattern: re.Pattern[str] | None = None,
+) -> None:
+    if pattern is None:
+        pattern = template_pattern(list(replacements))
+    if pattern is None:
+        document.save(output_path)
+        return
+
+    def lookup(match: re.Match[str]) -> str:
+        placeholder = match.group(0)
+        return replacements.get(placeholder[2:-2], placeholder)
+
+    for p in _iter_candidate_paragraphs(document):
+        nodes = _paragraph_text_nodes(p)
+        texts = _node_texts(nodes)
+        text = "".join(texts)
+        if "{{" not in text:
+            continue
+        # Only w:t text is rewritten, so run formatting and non-text content (drawings,
+        # field characters, note references) stay put. A placeholder's first w:t takes
+        # the value, its last w:t keeps what followed it, and any w:t strictly between
+        # is emptied. Going right to left keeps the original offsets valid.
+        offsets = list(accumulate(map(len, texts), initial=0))
+        new_texts = list(texts)
+        for match in reversed(list(pattern.finditer(text))):
+            first = bisect_right(offsets, match.start()) - 1
+            last = bisect_right(offsets, match.end() - 1) - 1
+            head = new_texts[first][: match.start() - offsets[first]]
+            tail = new_texts[last][match.end() - offsets[last]:]
+            for index in range(first + 1, last):
+                new_texts[index] = ""
+            if first == last:
+                new_texts[first] = head + lookup(match) + tail
+            else:
+                new_texts[first] = head + lookup(match)
+                new_texts[last] = tail
+        for node, old_text, new_text in zip(nodes, texts, new_texts):
+            if new_text != old_text:
+                node.text = new_text
+                if new_text != new_text.strip():
+                    node.set(XML_SPACE, "preserve")
+        _remove_emptied([node for node, old_text, new_text in zip(nodes, texts, new_texts) if old_text and not new_text])
 
     document.save(output_path)
 
 
-def read_docx_metadata(path: str) -> dict[str, str]:
+def _write_atomically(path: str, suffix: str, write) -> None:
+    tmp = tempfile.NamedTemporaryFile(
+        delete=False,
+        suffix=suffix,
+        dir=os.path.dirname(os.path.abspath(path)),
+        buffering=WRITE_BUFFER_SIZE,
+    )
+    try:
+        with tmp:
+            write(tmp)
+        os.replace(tmp.name, path)
+    except BaseException:
+        os.unlink(tmp.name)
+        raise
+
+
+def _cached_metadata(path: str, parse) -> dict[str, str]:
+    key = _file_key(path)
+    with _CACHE_LOCK:
+        metadata = _META_CACHE.get(key)
+        if metadata is not None:
+            _META_CACHE.move_to_end(key)
+            return dict(metadata)
+    metadata = parse(path)
+    with _CACHE_LOCK:
+        _cache_put(_META_CACHE, key, metadata, METADATA_CACHE_SIZE)
+    return dict(metadata)
+
+
+def _forget_metadata(path: str) -> None:
+    abspath = os.path.abspath(path)
+    with _CACHE_LOCK:
+        for key in [key for key in _META_CACHE if key[0] == abspath]:
+            del _META_CACHE[key]
+
+
+def _parse_docx_metadata(path: str) -> dict[str, str]:
+    from docx import Document
+
     document = Document(path)
     props = document.core_properties
     return {
         "DC:TITLE": props.title or "",
-        "DC:CREATOR": props.author or props.creator or "",
-        "CP:DESCRIPTION": props.description or "",
+        "DC:CREATOR": props.author or "",
+        "CP:DESCRIPTION": props.comments or "",
         "CP:CATEGORY": props.category or "",
     }
 
 
+def read_docx_metadata(path: str) -> dict[str, str]:
+    return _cached_metadata(path, _parse_docx_metadata)
+
+
+def _core_properties_name(archive: zipfile.ZipFile) -> str | None:
+    from docx.oxml import parse_xml
+
+    for rel in parse_xml(archive.read("_rels/.rels")):
+        if rel.get("Type") == CORE_PROPERTIES_RELATIONSHIP:
+            name = rel.get("Target", "").lstrip("/")
+            return name if name in archive.namelist() else None
+    return None
+
+
 def write_docx_metadata(path: str, title: str, creator: str, description: str, category: str) -> None:
-    document = Document(path)
-    props = document.core_properties
-    props.title = title or None
-    props.author = creator or None
-    props.creator = creator or None
-    props.description = description or None
-    props.category = category or None
-    with tempfile.NamedTemporaryFile(delete=False, suffix=".docx") as tmp:
-        temp_name = tmp.name
-    document.save(temp_name)
-    shutil.move(temp_name, path)
+    from docx import Document
+    from docx.opc.oxml import serialize_part_xml
+    from docx.oxml import parse_xml
+
+    with zipfile.ZipFile(path) as archive:
+        core_name = _core_properties_name(archive)
+        core = parse_xml(archive.read(core_name)) if core_name else None
+
+    if core is None:
+        # No core properties part yet: let python-docx create one with the full package.
+        document = Document(path)
+        props = document.core_properties
+        props.title = title
+        props.author = creator
+        props.comments = description
+        props.category = category
+        _write_atomically(path, ".docx", document.save)
+        _forget_metadata(path)
+        return
+
+    core.title_text = title
+    core.author_text = creator
+    core.comments_text = description
+    core.category_text = category
+    core_xml = serialize_part_xml(core)
+
+    def write(tmp) -> None:
+        with zipfile.ZipFile(path) as source, zipfile.ZipFile(tmp, "w") as target:
+            for item in source.infolist():
+                target.writestr(item, core_xml if item.filename == core_name else source.read(item))
+
+    _write_atomically(path, ".docx", write)
+    _forget_metadata(path)
 
 
 def clear_docx_metadata(path: str) -> None:
     write_docx_metadata(path, "", "", "", "")
 
 
+def _read_xref_section(stream, offset: int) -> tuple[list[tuple[int, int, int]], DictionaryObject]:
+    from PyPDF2.generic import DictionaryObject, read_object
+
+    stream.seek(offset)
+    if stream.readline().strip() != b"xref":
+        raise ValueError("xref stream")
+    subsections = []
+    while True:
+        line = stream.readline()
+        if line.lstrip().startswith(b"trailer"):
+            stream.seek(stream.tell() - len(line) + line.index(b"trailer") + len(b"trailer"))
+            break
+        match = XREF_SUBSECTION_PATTERN.match(line)
+        if match is None:
+            raise ValueError("malformed xref subsection")
+        start, count = int(match.group(1)), int(match.group(2))
+        subsections.append((start, count, stream.tell()))
+        stream.seek(count * 20, os.SEEK_CUR)
+    while stream.read(1).isspace():
+        pass
+    stream.seek(-1, os.SEEK_CUR)
+    trailer = read_object(stream, None)
+    if not isinstance(trailer, DictionaryObject):
+        raise ValueError("malformed trailer")
+    return subsections, trailer
+
+
+def _object_offset(stream, subsections: list[tuple[int, int, int]], ref: IndirectObject) -> int | None:
+    for start, count, position in subsections:
+        if start <= ref.idnum < start + count:
+            stream.seek(position + (ref.idnum - start) * 20)
+            match = XREF_ENTRY_PATTERN.match(stream.read(20))
+            if match is None or match.group(3) != b"n" or int(match.group(2)) != ref.generation:
+                raise ValueError("unusable xref entry")
+            return int(match.group(1))
+    return None
+
+
+def _read_pdf_info(path: str) -> DictionaryObject | None:
+    from PyPDF2.generic import DictionaryObject, IndirectObject, read_object
+
+    # Follow startxref -> classic xref table(s) -> trailer /Info without touching the
+    # page tree. Anything unusual (xref streams, encryption, indirect values) raises.
+    with open(path, "rb") as stream:
+        stream.seek(0, os.SEEK_END)
+        stream.seek(max(0, stream.tell() - PDF_TAIL_SIZE))
+        offsets = STARTXREF_PATTERN.findall(stream.read())
+        if not offsets:
+            raise ValueError("startxref not found")
+        offset: int | None = int(offsets[-1])
+        sections = []
+        info_ref = None
+        while offset is not None and len(sections) < 64:
+            subsections, trailer = _read_xref_section(stream, offset)
+            if "/Encrypt" in trailer:
+                raise ValueError("encrypted")
+            sections.append(subsections)
+            if info_ref is None:
+                info_ref = trailer.get("/Info")
+            prev = trailer.get("/Prev")
+            offset = int(prev) if prev is not None else None
+        if info_ref is None:
+            return None
+        if not isinstance(info_ref, IndirectObject):
+            raise ValueError("direct /Info")
+
+        for subsections in sections:
+            object_offset = _object_offset(stream, subsections, info_ref)
+            if object_offset is not None:
+                break
+        else:
+            raise ValueError("/Info object not in xref")
+        stream.seek(object_offset)
+        header = stream.read(64)
+        match = OBJECT_HEADER_PATTERN.match(header)
+        if match is None or (int(match.group(1)), int(match.group(2))) != (info_ref.idnum, info_ref.generation):
+            raise ValueError("bad object header")
+        stream.seek(object_offset + match.end())
+        while stream.read(1).isspace():
+            pass
+        stream.seek(-1, os.SEEK_CUR)
+        info = read_object(stream, None)
+    if not isinstance(info, DictionaryObject):
+        raise ValueError("malformed /Info")
+    if any(isinstance(info.get(key), IndirectObject) for key in PDF_INFO_KEYS.values()):
+        raise ValueError("indirect /Info value")
+    return info
+
+
+def _parse_pdf_metadata(path: str) -> dict[str, str]:
+    from PyPDF2 import PdfReader
+
+    try:
+        metadata = _read_pdf_info(path) or {}
+    except Exception:
+        metadata = PdfReader(path).metadata or {}
+    return {field: metadata.get(key, "") for field, key in PDF_INFO_KEYS.items()}
+
+
 def read_pdf_metadata(path: str) -> dict[str, str]:
-    reader = PdfReader(path)
-    metadata = reader.metadata or {}
-    return {
-        "DC:TITLE": metadata.get("/Title", ""),
-        "DC:CREATOR": metadata.get("/Author", ""),
-        "CP:DESCRIPTION": metadata.get("/Subject", ""),
-        "CP:CATEGORY": metadata.get("/Category", ""),
-    }
+    return _cached_metadata(path, _parse_pdf_metadata)
 
 
-def write_pdf_metadata(path: str, title: str, creator: str, description: str, category: str) -> None:
-    reader = PdfReader(path)
+def open_pdf_reader(path: str) -> PdfReader:
+    from PyPDF2 import PdfReader
+
+    return PdfReader(path)
+
+
+def write_pdf_metadata(
+    path: str,
+    title: str,
+    creator: str,
+    description: str,
+    category: str,
+    reader: PdfReader | None = None,
+) -> None:
+    from PyPDF2 import PdfWriter
+
+    if reader is None:
+        reader = open_pdf_reader(path)
     writer = PdfWriter()
-    for page in reader.pages:
-        writer.add_page(page)
+    writer.append_pages_from_reader(reader)
     writer.add_metadata({
         "/Title": title or "",
         "/Author": creator or "",
         "/Subject": description or "",
         "/Category": category or "",
     })
-    with tempfile.NamedTemporaryFile(delete=False, suffix=".pdf") as tmp:
-        writer.write(tmp)
-        temp_name = tmp.name
-    shutil.move(temp_name, path)
+    _write_atomically(path, ".pdf", writer.write)
+    _forget_metadata(path)
 
 
-def clear_pdf_metadata(path: str) -> None:
-    reader = PdfReader(path)
+def clear_pdf_metadata(path: str, reader: PdfReader | None = None) -> None:
+    from PyPDF2 import PdfWriter
+
+    if reader is None:
+        reader = open_pdf_reader(path)
     writer = PdfWriter()
-    for page in reader.pages:
-        writer.add_page(page)
-    with tempfile.NamedTemporaryFile(delete=False, suffix=".pdf") as tmp:
-        writer.write(tmp)
-        temp_name = tmp.name
-    shutil.move(temp_name, path)
+    writer.append_pages_from_reader(reader)
+    _write_atomically(path, ".pdf", writer.write)
+    _forget_metadata(path)
+
+
+def read_metadata(path: str) -> dict[str, str]:
+    if path.lower().endswith(".docx"):
+        return read_docx_metadata(path)
+    if path.lower().endswith(".pdf"):
+        return read_pdf_metadata(path)
+    raise ValueError("Formato não suportado")
 
 
 class CurriculumApp(tk.Tk):
@@ -142,8 +483,17 @@ class CurriculumApp(tk.Tk):
         notebook = ttk.Notebook(self)
         notebook.pack(fill=tk.BOTH, expand=True)
 
-        self.placeholder_entries: dict[str, tk.Entry] = {}
+        self.placeholder_names: list[str] = []
+        self.placeholder_entries: list[tk.Entry] = []
         self.template_path: str | None = None
+        self._pending_template: str | None = None
+        self._template_jobs: list[Future] = []
+        self._pending_read: str | None = None
+        self._pending_edit: str | None = None
+        self._pool = ThreadPoolExecutor(max_workers=2)
+        self._pdf_reader: tuple[tuple[str, int, int], Future] | None = None
+        self.protocol("WM_DELETE_WINDOW", self._on_close)
+        self._template_regex: re.Pattern[str] | None = None
 
         self.tab_template = ttk.Frame(notebook)
         notebook.add(self.tab_template, text="Preencher Currículo")
@@ -161,6 +511,38 @@ class CurriculumApp(tk.Tk):
         notebook.add(self.tab_edit, text="Editar Metadados")
         self._build_edit_tab()
 
+    def _on_close(self) -> None:
+        self._pool.shutdown(wait=False, cancel_futures=True)
+        self.destroy()
+
+    def _run_in_background(self, on_done, func, *args) -> Future:
+        # Tk is not thread-safe: the worker only parses, and the Tk thread polls
+        # for the result so widgets are only ever touched from here.
+        future = self._pool.submit(func, *args)
+        self._poll_future(future, on_done)
+        return future
+
+    def _poll_future(self, future: Future, on_done) -> None:
+        if future.done():
+            on_done(future)
+        else:
+            self.after(WORKER_POLL_MS, self._poll_future, future, on_done)
+
+    def _take_pdf_reader(self, path: str) -> PdfReader | None:
+        # The edit tab prefetches the reader of the PDF it loaded. It is handed over once,
+        # and only while the file is unchanged (same path, mtime and size).
+        # future.exception() waits for a prefetch still in flight, blocking the Tk thread
+        # until that parse finishes, which the write would have had to do anyway.
+        if self._pdf_reader is None:
+            return None
+        key, future = self._pdf_reader
+        if key[0] != os.path.abspath(path):
+            return None
+        self._pdf_reader = None
+        if key != _file_key(path) or future.exception() is not None:
+            return None
+        return future.result()
+
     def _build_template_tab(self) -> None:
         frame = ttk.Frame(self.tab_template, padding=20)
         frame.pack(fill=tk.BOTH, expand=True)
@@ -180,17 +562,28 @@ class CurriculumApp(tk.Tk):
         path = filedialog.askopenfilename(title="Selecione o currículo modelo", filetypes=[("Documentos Word", "*.docx")])
         if not path:
             return
+        self._pending_template = path
+        self._template_jobs = [job for job in self._template_jobs if not job.done()]
+        self._template_jobs.append(
+            self._run_in_background(lambda future: self._show_placeholders(path, future), extract_placeholders, path)
+        )
+
+    def _show_placeholders(self, path: str, future: Future) -> None:
+        if path != self._pending_template:
+            return
         try:
-            placeholders = extract_placeholders(path)
+            placeholders = future.result()
         except Exception as exc:
             messagebox.showerror("Erro", f"Não foi possível ler o arquivo: {exc}")
             return
 
         self.template_path = path
+        self._template_regex = template_pattern(placeholders)
         self.template_label.configure(text=f"Modelo: {os.path.basename(path)}")
 
         for widget in self.placeholder_frame.winfo_children():
             widget.destroy()
+        self.placeholder_names.clear()
         self.placeholder_entries.clear()
 
         if not placeholders:
@@ -202,15 +595,20 @@ class CurriculumApp(tk.Tk):
                 ttk.Label(row, text=placeholder, width=25).pack(side=tk.LEFT)
                 entry = ttk.Entry(row)
                 entry.pack(side=tk.LEFT, fill=tk.X, expand=True)
-                self.placeholder_entries[placeholder] = entry
+                self.placeholder_names.append(placeholder)
+                self.placeholder_entries.append(entry)
 
     def _generate_document(self) -> None:
         if not self.template_path:
             messagebox.showwarning("Atenção", "Selecione um modelo primeiro.")
             return
-        replacements = {name: entry.get() for name, entry in self.placeholder_entries.items()}
-        missing = [name for name, value in replacements.items() if not value]
-        if missing:
+        # A running extraction may be reading the cached Document that generation is
+        # about to take and mutate; lxml trees must not be shared across threads that way.
+        if any(not job.done() for job in self._template_jobs):
+            messagebox.showwarning("Atenção", "Aguarde o carregamento do modelo.")
+            return
+        values = [entry.get() for entry in self.placeholder_entries]
+        if not all(values):
             if not messagebox.askyesno("Campos vazios", "Algumas variáveis estão vazias. Deseja continuar?"):
                 return
         save_path = filedialog.asksaveasfilename(
@@ -220,8 +618,9 @@ class CurriculumApp(tk.Tk):
         )
         if not save_path:
             return
+        replacements = dict(zip(self.placeholder_names, values))
         try:
-            replace_placeholders(self.template_path, replacements, save_path)
+            replace_placeholders(take_document(self.template_path), replacements, save_path, self._template_regex)
             messagebox.showinfo("Sucesso", f"Currículo salvo em {save_path}")
         except Exception as exc:
             messagebox.showerror("Erro", f"Não foi possível gerar o currículo: {exc}")
@@ -244,7 +643,7 @@ class CurriculumApp(tk.Tk):
             if path.lower().endswith(".docx"):
                 clear_docx_metadata(path)
             elif path.lower().endswith(".pdf"):
-                clear_pdf_metadata(path)
+                clear_pdf_metadata(path, self._take_pdf_reader(path))
             else:
                 raise ValueError("Formato não suportado")
             messagebox.showinfo("Sucesso", "Metadados removidos com sucesso!")
@@ -267,13 +666,14 @@ class CurriculumApp(tk.Tk):
         )
         if not path:
             return
+        self._pending_read = path
+        self._run_in_background(lambda future: self._show_metadata(path, future), read_metadata, path)
+
+    def _show_metadata(self, path: str, future: Future) -> None:
+        if path != self._pending_read:
+            return
         try:
-            if path.lower().endswith(".docx"):
-                data = read_docx_metadata(path)
-            elif path.lower().endswith(".pdf"):
-                data = read_pdf_metadata(path)
-            else:
-                raise ValueError("Formato não suportado")
+            data = future.result()
         except Exception as exc:
             messagebox.showerror("Erro", f"Não foi possível ler os metadados: {exc}")
             return
@@ -320,13 +720,21 @@ class CurriculumApp(tk.Tk):
         )
         if not path:
             return
+        self._pending_edit = path
+        self._pdf_reader = None
+        self._run_in_background(lambda future: self._show_for_edit(path, future), read_metadata, path)
+        if path.lower().endswith(".pdf"):
+            try:
+                key = _file_key(path)
+            except OSError:
+                return
+            self._pdf_reader = (key, self._pool.submit(open_pdf_reader, path))
+
+    def _show_for_edit(self, path: str, future: Future) -> None:
+        if path != self._pending_edit:
+            return
         try:
-            if path.lower().endswith(".docx"):
-                metadata = read_docx_metadata(path)
-            elif path.lower().endswith(".pdf"):
-                metadata = read_pdf_metadata(path)
-            else:
-                raise ValueError("Formato não suportado")
+            metadata = future.result()
         except Exception as exc:
             messagebox.showerror("Erro", f"Não foi possível carregar os metadados: {exc}")
             return
@@ -356,7 +764,8 @@ class CurriculumApp(tk.Tk):
             if self.editing_path.lower().endswith(".docx"):
                 write_docx_metadata(self.editing_path, title, creator, description, category)
             elif self.editing_path.lower().endswith(".pdf"):
-                write_pdf_metadata(self.editing_path, title, creator, description, category)
+                reader = self._take_pdf_reader(self.editing_path)
+                write_pdf_metadata(self.editing_path, title, creator, description, category, reader)
             else:
                 raise ValueError("Formato não suportado")
             messagebox.showinfo("Sucesso", "Metadados atualizados!")